@@ -4,7 +4,9 @@ David López y Jhon Alexis
 Back-end
 """
 import random
-from typing import List, Tuple, Optional
+from array import array
+from collections import OrderedDict
+from typing import Callable, List, Tuple, Optional
 
 # ESTRUCTURA 1: LISTA ENLAZADA CIRCULAR
 
@@ -26,6 +28,7 @@ class ListaEnlazadaCircular:
 
     def __init__(self):
         self.cabeza = None
+        self.ultimo = None  # Para agregar al final sin recorrer la lista
         self.cantidad = 0
 
     def agregar(self, fila: int, col: int) -> NodoCelda:
@@ -34,11 +37,9 @@ class ListaEnlazadaCircular:
             self.cabeza = nuevo
             nuevo.siguiente = self.cabeza
         else:
-            actual = self.cabeza
-            while actual.siguiente != self.cabeza:
-                actual = actual.siguiente
-            actual.siguiente = nuevo
+            self.ultimo.siguiente = nuevo
             nuevo.siguiente = self.cabeza
+        self.ultimo = nuevo
         self.cantidad += 1
         return nuevo
 
@@ -136,12 +137,223 @@ class Cola:
         return self.frente is None
 
 
+# TOPOLOGÍA DEL TABLERO (vecinos precalculados)
+
+class Topologia:
+    """
+    Tablas de vecinos precalculadas para un tamaño de tablero.
+    Las celdas se numeran por índice: fila * columnas + col.
+    Los vecinos de la celda i son vecinos[inicio[i]:inicio[i + 1]]
+    (arreglos planos, sin una tupla por celda)
+    """
+
+    def __init__(self, filas: int, columnas: int):
+        self.filas = filas
+        self.columnas = columnas
+        self.total = filas * columnas
+
+        # Todas las filas del medio tienen los mismos vecinos relativos; solo
+        # cambian la primera y la última. Se arma una plantilla por tipo de fila
+        plantillas = {}
+        self.inicio = array('l', [0])
+        self.vecinos = array('l')
+        for i in range(filas):
+            tipo = (i > 0, i < filas - 1)  # (hay fila arriba, hay fila abajo)
+            if tipo not in plantillas:
+                plantillas[tipo] = self._plantilla_fila(*tipo)
+            relativos, acumulados = plantillas[tipo]
+
+            base = i * columnas
+            desde = len(self.vecinos)
+            self.vecinos.extend([base + r for r in relativos])
+            self.inicio.extend([desde + a for a in acumulados])
+
+        # Máscaras para el modo bits: bit i = celda de índice i
+        self.lleno = (1 << self.total) - 1
+        primera_col = int(('0' * (columnas - 1) + '1') * filas, 2)
+        self.sin_primera_col = self.lleno & ~primera_col
+        self.sin_ultima_col = self.lleno & ~(primera_col << (columnas - 1))
+
+    def _plantilla_fila(self, arriba: bool, abajo: bool) -> Tuple[List[int], List[int]]:
+        """
+        Vecinos de una fila relativos al inicio de la fila, y cuántos
+        vecinos se acumulan al terminar cada celda
+        """
+        direcciones = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+        relativos = []
+        acumulados = []
+        for j in range(self.columnas):
+            for df, dc in direcciones:
+                # Verificar que esté dentro del tablero
+                if (df == -1 and not arriba) or (df == 1 and not abajo):
+                    continue
+                if 0 <= j + dc < self.columnas:
+                    relativos.append(df * self.columnas + j + dc)
+            acumulados.append(len(relativos))
+        return relativos, acumulados
+
+    def indice(self, fila: int, col: int) -> int:
+        return fila * self.columnas + col
+
+    def posicion(self, indice: int) -> Tuple[int, int]:
+        return divmod(indice, self.columnas)
+
+    def vecinos_de(self, indice: int) -> array:
+        """Índices de las celdas vecinas de una celda"""
+        return self.vecinos[self.inicio[indice]:self.inicio[indice + 1]]
+
+    def dilatar(self, bits: int) -> int:
+        """Agrega a un conjunto de bits todas las celdas vecinas de sus celdas"""
+        # Primero horizontal (sin pasar de una fila a otra), luego vertical
+        horizontal = bits | ((bits & self.sin_ultima_col) << 1) | ((bits & self.sin_primera_col) >> 1)
+        return (horizontal | (horizontal << self.columnas) | (horizontal >> self.columnas)) & self.lleno
+
+
+# Topologías ya calculadas, de la menos a la más usada recientemente
+LIMITE_CELDAS_CACHE = 1_000_000
+_topologias: "OrderedDict[Tuple[int, int], Topologia]" = OrderedDict()
+
+
+def obtener_topologia(filas: int, columnas: int) -> Topologia:
+    """
+    Retorna la topología de un tamaño, compartida entre juegos del mismo tamaño.
+    La caché guarda como máximo LIMITE_CELDAS_CACHE celdas en total; un
+    tablero más grande que eso no se guarda y vive solo con su juego
+    """
+    clave = (filas, columnas)
+    topologia = _topologias.get(clave)
+    if topologia is not None:
+        _topologias.move_to_end(clave)
+        return topologia
+
+    topologia = Topologia(filas, columnas)
+    if topologia.total > LIMITE_CELDAS_CACHE:
+        return topologia
+
+    _topologias[clave] = topologia
+    total = sum(t.total for t in _topologias.values())
+    while total > LIMITE_CELDAS_CACHE:
+        _, vieja = _topologias.popitem(last=False)
+        total -= vieja.total
+    return topologia
+
+
+def limpiar_cache_topologias():
+    """Vacía la caché de topologías"""
+    _topologias.clear()
+
+
+def indices_de_bits(bits: int) -> List[int]:
+    """Retorna los índices de los bits encendidos, de menor a mayor"""
+    binario = bin(bits)[:1:-1]  # Sin el prefijo '0b', bit 0 primero
+    return [i for i, bit in enumerate(binario) if bit == '1']
+
+
+class TableroBits:
+    """
+    Estado del tablero como enteros de Python usados como conjuntos de bits
+    (bit i = celda de índice i). Expandir y verificar victoria se reducen a
+    desplazamientos y máscaras sobre todo el tablero a la vez
+    """
+
+    def __init__(self, topologia: Topologia):
+        self.topologia = topologia
+        self.minas = 0
+        self.reveladas = 0
+        self.marcadas = 0
+        self.ceros = 0  # Celdas sin mina y sin minas adyacentes
+
+    def cargar_minas(self, celdas: List[NodoCelda]):
+        """Copia las minas de las celdas y limpia el resto del estado"""
+        # Se arma el número en binario de una vez (la última celda es el bit más alto);
+        # encender bit por bit copiaría el entero completo en cada paso
+        minas = int(''.join(['1' if celda.tiene_mina else '0' for celda in reversed(celdas)]) or '0', 2)
+        self.minas = minas
+        self.reveladas = 0
+        self.marcadas = 0
+        self.ceros = self.topologia.lleno & ~self.topologia.dilatar(minas)
+
+    def expandir(self, semilla: int) -> int:
+        """
+        Retorna las celdas que revela la expansión a partir de un conjunto de
+        celdas. Igual que el BFS: las marcadas y ya reveladas no se cruzan
+        """
+        disponibles = self.topologia.lleno & ~self.reveladas & ~self.marcadas
+        region = semilla & disponibles
+        if not region & self.ceros:
+            return region  # Sin ceros no hay nada que expandir
+        while True:
+            nueva = (region | self.topologia.dilatar(region & self.ceros)) & disponibles
+            if nueva == region:
+                return region
+            region = nueva
+
+    def regiones_cero(self) -> int:
+        """Retorna todas las celdas que revelarían las regiones de ceros aún ocultas"""
+        return self.expandir(self.ceros)
+
+    def gano(self) -> bool:
+        """Victoria: toda celda es mina o está revelada"""
+        return (self.reveladas | self.minas) == self.topologia.lleno
+
+
+# EVENTOS (patrón observador entre back-end y front-end)
+
+class Evento:
+    """Clase base de los eventos que emite el juego a sus oyentes"""
+
+
+class CeldasReveladas(Evento):
+    """Una o más celdas fueron reveladas (una expansión completa llega junta).
+    celdas: lista de (fila, col, minas_adyacentes, tiene_mina)"""
+
+    def __init__(self, celdas: List[Tuple[int, int, int, bool]]):
+        self.celdas = celdas
+
+
+class BanderaCambiada(Evento):
+    """Se puso o se quitó una bandera"""
+
+    def __init__(self, fila: int, col: int, marcada: bool, banderas_restantes: int):
+        self.fila = fila
+        self.col = col
+        self.marcada = marcada
+        self.banderas_restantes = banderas_restantes
+
+
+class JuegoGanado(Evento):
+    """Se revelaron todas las celdas sin mina"""
+
+
+class JuegoPerdido(Evento):
+    """Se reveló una mina. minas: posiciones de todas las minas"""
+
+    def __init__(self, fila: int, col: int, minas: List[Tuple[int, int]]):
+        self.fila = fila
+        self.col = col
+        self.minas = minas
+
+
+class MovimientoDeshecho(Evento):
+    """Se deshizo un movimiento; trae el estado final de la celda afectada"""
+
+    def __init__(self, fila: int, col: int, accion: str, revelada: bool,
+                 marcada: bool, banderas_restantes: int):
+        self.fila = fila
+        self.col = col
+        self.accion = accion
+        self.revelada = revelada
+        self.marcada = marcada
+        self.banderas_restantes = banderas_restantes
+
+
 # CLASE PRINCIPAL DEL JUEGO
 
 class Buscaminas:
     """Clase principal que gestiona la lógica del juego Buscaminas"""
 
-    def __init__(self, filas: int = 10, columnas: int = 10, num_minas: int = 15):
+    def __init__(self, filas: int = 10, columnas: int = 10, num_minas: int = 15,
+                 modo_bits: bool = False):
 
         # Inicializa el juego
 
@@ -153,21 +365,49 @@ class Buscaminas:
         self.juego_terminado = False
         self.victoria = False
         self.celdas_reveladas = 0
+        self.banderas_colocadas = 0
+
+        # Oyentes de eventos
+        self.oyentes: List[Callable[[Evento], None]] = []
 
         # Crear matriz auxiliar para acceso rápido
         self.matriz = [[None for _ in range(columnas)] for _ in range(filas)] # _ = bucle infinito
+        self.celdas: List[NodoCelda] = []  # Las mismas celdas, por índice
+
+        # Vecinos precalculados y, opcionalmente, el tablero en bits
+        self.topologia = obtener_topologia(filas, columnas)
+        self.bits = TableroBits(self.topologia) if modo_bits else None
 
         # Inicializar tablero
         self._inicializar_tablero()
         self._colocar_minas()
         self._calcular_numeros()
 
+    def suscribir(self, oyente: Callable[[Evento], None]):
+        """Registra una función que recibirá los eventos del juego"""
+        if oyente not in self.oyentes:
+            self.oyentes.append(oyente)
+
+    def desuscribir(self, oyente: Callable[[Evento], None]):
+        """Quita un oyente registrado"""
+        if oyente in self.oyentes:
+            self.oyentes.remove(oyente)
+
+    def _emitir(self, evento: Evento):
+        """
+        Entrega un evento a los oyentes.
+        Quien llama verifica antes que haya oyentes, para no crear eventos en vano
+        """
+        for oyente in list(self.oyentes):
+            oyente(evento)
+
     def _inicializar_tablero(self):
         """Crea todas las celdas del tablero usando lista enlazada circular"""
         for i in range(self.filas):
             for j in range(self.columnas):
                 nodo = self.tablero.agregar(i, j)
                 self.matriz[i][j] = nodo
+                self.celdas.append(nodo)
 
     def _colocar_minas(self):
         """Coloca minas aleatoriamente en el tablero"""
@@ -183,23 +423,21 @@ class Buscaminas:
 
     def _calcular_numeros(self):
         """Calcula el número de minas adyacentes para cada celda"""
-        direcciones = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)] # Direcciones de las celdas
-
-        for i in range(self.filas):
-            for j in range(self.columnas):
-                celda = self.matriz[i][j]
-                if not celda.tiene_mina:
-                    contador = 0
-
-                    # Revisar las 8 celdas vecinas
-                    for df, dc in direcciones:
-                        ni, nj = i + df, j + dc
-
-                        # Verificar que esté dentro del tablero
-                        if 0 <= ni < self.filas and 0 <= nj < self.columnas:
-                            if self.matriz[ni][nj].tiene_mina:
-                                contador += 1
-                    celda.minas_adyacentes = contador
+        celdas = self.celdas
+        inicio = self.topologia.inicio
+        vecinos = self.topologia.vecinos
+
+        for i, celda in enumerate(celdas):
+            if not celda.tiene_mina:
+                # Revisar las celdas vecinas (ya vienen dentro del tablero)
+                contador = 0
+                for v in vecinos[inicio[i]:inicio[i + 1]]:
+                    if celdas[v].tiene_mina:
+                        contador += 1
+                celda.minas_adyacentes = contador
+
+        if self.bits is not None:
+            self.bits.cargar_minas(celdas)
 
     def revelar_celda(self, fila: int, col: int) -> dict:
         """
@@ -234,25 +472,88 @@ class Buscaminas:
         # Si hay mina, juego terminado
         if celda.tiene_mina:
             celda.revelada = True
+            if self.bits is not None:
+                self.bits.reveladas |= 1 << self.topologia.indice(fila, col)
             self.juego_terminado = True
             self.victoria = False
-            resultado['Game_over'] = True
-            resultado['Celdas_reveladas'].append((fila, col))
+            resultado['game_over'] = True
+            resultado['celdas_reveladas'].append((fila, col))
+            if self.oyentes:
+                self._emitir(CeldasReveladas([(fila, col, celda.minas_adyacentes, True)]))
+                self._emitir(JuegoPerdido(fila, col, self.revelar_todo()))
             return resultado
 
-        # Usar COLA para expansión automática (BFS) Si no hay mina
+        if self.bits is not None:
+            self._expandir_bits(fila, col, resultado)
+        else:
+            self._expandir_cola(fila, col, resultado)
+
+        self._terminar_revelado(resultado)
+        return resultado
+
+    def revelar_regiones_cero(self) -> dict:
+        """
+        Revela de una vez todas las regiones de celdas vacías que siguen
+        ocultas, con sus bordes, como si se hiciera click en cada una.
+        No se guarda en el historial, así que no se puede deshacer
+        Returns: dict con información del resultado (igual que revelar_celda)
+        """
+        resultado = {
+            'valido': True,
+            'game_over': False,
+            'victoria': False,
+            'celdas_reveladas': []
+        }
+
+        if self.juego_terminado:
+            resultado['valido'] = False
+            return resultado
+
+        if self.bits is not None:
+            # Todas las regiones a la vez con desplazamientos y máscaras
+            self._aplicar_bits(self.bits.regiones_cero(), resultado)
+        else:
+            for indice, celda in enumerate(self.celdas):
+                if (celda.minas_adyacentes == 0 and not celda.tiene_mina
+                        and not celda.revelada and not celda.marcada):
+                    self._expandir_cola(*divmod(indice, self.columnas), resultado)
+
+        self._terminar_revelado(resultado)
+        return resultado
+
+    def _terminar_revelado(self, resultado: dict):
+        """Verifica victoria y avisa a los oyentes después de revelar celdas sin mina"""
+        # Verificar victoria
+        self._verificar_victoria()
+        resultado['victoria'] = self.victoria
+        resultado['game_over'] = self.victoria
+
+        # Un solo evento para toda la expansión
+        if self.oyentes:
+            if resultado['celdas_reveladas']:
+                self._emitir(CeldasReveladas([
+                    (f, c, self.matriz[f][c].minas_adyacentes, False)
+                    for f, c in resultado['celdas_reveladas']
+                ]))
+            if self.victoria:
+                self._emitir(JuegoGanado())
+
+    def _expandir_cola(self, fila: int, col: int, resultado: dict):
+        """Expansión automática con la COLA (BFS) sobre los vecinos precalculados"""
+        celdas = self.celdas
+        inicio = self.topologia.inicio
+        vecinos = self.topologia.vecinos
+        columnas = self.columnas
+
         cola = Cola()  # ESTRUCTURA 3: Crear cola vacía
         cola.encolar(fila, col)  # Agregar celda inicial
-        visitados = set()  # Para no procesar la misma celda dos veces
+        visitados = {fila * columnas + col}  # Se marca al encolar para no repetir celdas
 
         while not cola.esta_vacia():
             f, c = cola.desencolar() # Sacar primera celda de la cola
+            indice = f * columnas + c
 
-            if (f, c) in visitados:
-                continue
-            visitados.add((f, c))
-
-            celda_actual = self.matriz[f][c]
+            celda_actual = celdas[indice]
             if celda_actual.revelada or celda_actual.marcada:
                 continue
 
@@ -263,19 +564,33 @@ class Buscaminas:
 
             # Si no tiene minas adyacentes, expandir
             if celda_actual.minas_adyacentes == 0:
-                direcciones = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-                for df, dc in direcciones:
-                    nf, nc = f + df, c + dc
-                    if 0 <= nf < self.filas and 0 <= nc < self.columnas:
-                        if (nf, nc) not in visitados:
-                            cola.encolar(nf, nc)
+                for v in vecinos[inicio[indice]:inicio[indice + 1]]:
+                    if v not in visitados:
+                        visitados.add(v)
+                        cola.encolar(*divmod(v, columnas))
 
-        # Verificar victoria
-        self._verificar_victoria()
-        resultado['victoria'] = self.victoria
-        resultado['game_over'] = self.victoria
+    def _expandir_bits(self, fila: int, col: int, resultado: dict):
+        """
+        Expansión automática con el tablero en bits; las celdas salen en
+        orden de índice en vez del orden del BFS
+        """
+        semilla = 1 << self.topologia.indice(fila, col)
+        if self.matriz[fila][col].minas_adyacentes != 0:
+            # Un número no expande: no hace falta operar sobre todo el tablero
+            self._aplicar_bits(semilla, resultado)
+        else:
+            self._aplicar_bits(self.bits.expandir(semilla), resultado)
 
-        return resultado
+    def _aplicar_bits(self, nuevas: int, resultado: dict):
+        """Pasa a las celdas (nodos) y a los contadores las celdas reveladas en bits"""
+        self.bits.reveladas |= nuevas
+
+        celdas = self.celdas
+        reveladas = resultado['celdas_reveladas']
+        for indice in indices_de_bits(nuevas):
+            celdas[indice].revelada = True
+            reveladas.append(divmod(indice, self.columnas))
+            self.celdas_reveladas += 1
 
     def marcar_celda(self, fila: int, col: int) -> bool: # Marca la celda con validaciones
         """Marca o desmarca una celda como posible mina"""
@@ -291,12 +606,19 @@ class Buscaminas:
             return False
 
         celda.marcada = not celda.marcada
+        self.banderas_colocadas += 1 if celda.marcada else -1
+        if self.bits is not None:
+            self.bits.marcadas ^= 1 << self.topologia.indice(fila, col)
         self.historial.apilar(fila, col, "marcar") # Guardar en PILA
+        if self.oyentes:
+            self._emitir(BanderaCambiada(fila, col, celda.marcada, self.obtener_banderas_restantes()))
         return True
 
     def deshacer_movimiento(self) -> bool:
         """Deshace el último movimiento usando la PILA"""
-        if self.historial.esta_vacia():
+        # Una partida ganada o perdida no se deshace: la jugada que la cerró
+        # cambió el estado de todo el tablero (por ejemplo, las minas mostradas)
+        if self.juego_terminado or self.historial.esta_vacia():
             return False
 
         fila, col, accion = self.historial.desapilar()
@@ -305,13 +627,27 @@ class Buscaminas:
         if accion == "revelar" and celda.revelada:
             celda.revelada = False
             self.celdas_reveladas -= 1
+            if self.bits is not None:
+                self.bits.reveladas &= ~(1 << self.topologia.indice(fila, col))
         elif accion == "marcar":
             celda.marcada = not celda.marcada
+            self.banderas_colocadas += 1 if celda.marcada else -1
+            if self.bits is not None:
+                self.bits.marcadas ^= 1 << self.topologia.indice(fila, col)
 
+        if self.oyentes:
+            self._emitir(MovimientoDeshecho(fila, col, accion, celda.revelada, celda.marcada,
+                                            self.obtener_banderas_restantes()))
         return True
 
     def _verificar_victoria(self):
         """Verifica si el jugador ha ganado"""
+        if self.bits is not None:
+            if self.bits.gano():
+                self.juego_terminado = True
+                self.victoria = True
+            return
+
         # 1. Calcular cuántas celdas debe revelar el jugador para ganar
         celdas_sin_minas = self.filas * self.columnas - self.num_minas
 
@@ -327,6 +663,7 @@ class Buscaminas:
         self.juego_terminado = False
         self.victoria = False
         self.celdas_reveladas = 0
+        self.banderas_colocadas = 0
 
         # 2. Limpiar historial (vaciar la PILA)
         while not self.historial.esta_vacia():
@@ -347,14 +684,8 @@ class Buscaminas:
 
     def obtener_banderas_restantes(self) -> int:
         """Retorna cuántas banderas quedan por colocar"""
-        banderas_colocadas = 0
-
-        # Contar cuántas banderas hay en el tablero
-        for i in range(self.filas):
-            for j in range(self.columnas):
-                if self.matriz[i][j].marcada:
-                    banderas_colocadas += 1
-        return self.num_minas - banderas_colocadas
+        # El contador se mantiene al marcar, deshacer y reiniciar
+        return self.num_minas - self.banderas_colocadas
 
     def revelar_todo(self) -> List[Tuple[int, int]]:
         """Retorna las posiciones de todas las minas"""
@@ -5,11 +5,28 @@ Interfaz Gráfica (GUI)
 
 """
 
+import queue
+import threading
+import time
 import tkinter as tk
+from collections import deque
 from tkinter import messagebox
 
 # Importar el backend
-from Buscaminas import Buscaminas
+from Buscaminas import (
+    Buscaminas, Evento, CeldasReveladas, BanderaCambiada,
+    JuegoGanado, JuegoPerdido, MovimientoDeshecho
+)
+
+# Cada cuánto se revisa la cola de resultados del hilo del motor (~60 cuadros/s)
+INTERVALO_MS = 16
+
+# Tiempo máximo por cuadro para pintar celdas, así la ventana no se congela
+PRESUPUESTO_CUADRO_S = 0.010
+
+# El aviso de "ocupado" solo aparece si la jugada tarda más que esto,
+# para que no parpadee en jugadas instantáneas como marcar
+RETRASO_OCUPADO_MS = 150
 
 
 class BuscaminasGUI:
@@ -39,6 +56,16 @@ class BuscaminasGUI:
         self.juego = None #instancia del back-end
         self.botones = []
 
+        # El motor corre en un hilo aparte; la interfaz solo se toca desde el hilo de Tk
+        self.ocupado = False  # Hay una jugada en curso: se ignoran los clicks
+        self._num_tarea = 0  # Identifica la jugada en curso para el aviso retrasado
+        self._tareas = queue.Queue()  # Tareas para el hilo del motor
+        self._resultados = queue.Queue()  # Eventos y resultados de vuelta a Tk
+        self._celdas_pendientes = deque()  # Celdas por pintar en los siguientes cuadros
+        self._aviso_final = None  # Diálogo de victoria/derrota, se muestra al terminar la jugada
+        self._sondeando = False
+        threading.Thread(target=self._hilo_motor, daemon=True).start()
+
         # Crear interfaz
         self._crear_interfaz()
         self._nuevo_juego()
@@ -84,6 +111,16 @@ class BuscaminasGUI:
             pady=5
         ).pack(side=tk.LEFT, padx=5)
 
+        # Indicador de jugada en curso
+        self.label_estado = tk.Label(
+            frame_top,
+            text="",
+            font=('Arial', 12),
+            bg='#34495e',
+            fg='white'
+        )
+        self.label_estado.pack(side=tk.RIGHT, padx=10)
+
         # Frame del tablero
         self.frame_tablero = tk.Frame(self.root, bg='#2c3e50', padx=10, pady=10)
         self.frame_tablero.pack()
@@ -130,99 +167,204 @@ class BuscaminasGUI:
                 fila.append(btn)
             self.botones.append(fila)
 
+    # HILO DEL MOTOR
+
+    def _hilo_motor(self):
+        """Ejecuta las tareas del back-end una por una, fuera del hilo de Tk"""
+        while True:
+            tarea, al_terminar = self._tareas.get()
+            try:
+                resultado = tarea()
+            except Exception as error:
+                self._resultados.put(('error', error))
+            else:
+                self._resultados.put(('fin', (al_terminar, resultado)))
+
+    def _recibir_evento(self, evento: Evento):
+        """Oyente del juego: corre en el hilo del motor, solo encola el evento"""
+        self._resultados.put(('evento', evento))
+
+    def _en_segundo_plano(self, tarea, al_terminar=None):
+        """Envía una tarea al hilo del motor y bloquea la entrada hasta que termine"""
+        self.ocupado = True
+        self._num_tarea += 1
+        num_tarea = self._num_tarea
+        self.root.after(RETRASO_OCUPADO_MS, lambda: self._mostrar_ocupado(num_tarea))
+        self._tareas.put((tarea, al_terminar))
+        self._programar_sondeo()
+
+    def _mostrar_ocupado(self, num_tarea):
+        """Muestra el aviso de jugada en curso si esa jugada todavía no termina"""
+        if self.ocupado and num_tarea == self._num_tarea:
+            self.label_estado.config(text="⏳ Pensando...")
+            self.root.config(cursor='watch')
+
+    def _liberar(self):
+        """Termina la jugada en curso: acepta clicks y quita el aviso"""
+        self.ocupado = False
+        self.label_estado.config(text="")
+        self.root.config(cursor='')
+
+    def _programar_sondeo(self):
+        if not self._sondeando:
+            self._sondeando = True
+            self.root.after(INTERVALO_MS, self._procesar_resultados)
+
+    def _procesar_resultados(self):
+        """
+        Atiende lo que llegó del hilo del motor sin pasarse del presupuesto
+        del cuadro; lo que sobra se pinta en los cuadros siguientes
+        """
+        self._sondeando = False
+        inicio = time.perf_counter()
+
+        while time.perf_counter() - inicio < PRESUPUESTO_CUADRO_S:
+            # Primero terminar de pintar la expansión en curso
+            if self._celdas_pendientes:
+                self._actualizar_celda(*self._celdas_pendientes.popleft())
+                continue
+
+            try:
+                tipo, dato = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+
+            if tipo == 'evento':
+                self._atender_evento(dato)
+            elif tipo == 'fin':
+                # Liberar antes de cualquier diálogo: un diálogo modal procesa
+                # los temporizadores pendientes, como el aviso de "ocupado"
+                self._liberar()
+                al_terminar, resultado = dato
+                if al_terminar is not None:
+                    al_terminar(resultado)
+                self._mostrar_aviso_final()
+            elif tipo == 'error':
+                self._liberar()
+                self._aviso_final = None
+                messagebox.showerror("Error", str(dato))
+
+        if self.ocupado or self._celdas_pendientes or not self._resultados.empty():
+            self._programar_sondeo()
+
+    # ACCIONES DEL JUGADOR
+
     def _nuevo_juego(self):
         """Inicia un nuevo juego"""
-        self.juego = Buscaminas(self.filas, self.columnas, self.minas)
-        self._crear_tablero()
-        self._actualizar_banderas()
+        if self.ocupado:
+            return
 
-    def _click_izquierdo(self, fila, col):
-        """Maneja click izquierdo - Revelar"""
-        resultado = self.juego.revelar_celda(fila, col)
+        filas, columnas, minas = self.filas, self.columnas, self.minas
 
-        if not resultado['valido']:
-            return
+        def crear():
+            juego = Buscaminas(filas, columnas, minas)
+            juego.suscribir(self._recibir_evento)
+            return juego
 
-        # Actualizar celdas reveladas
-        for f, c in resultado['celdas_reveladas']:
-            self._actualizar_celda(f, c)
+        self._en_segundo_plano(crear, self._instalar_juego)
 
-        # Verificar fin de juego
-        if resultado['game_over']:
-            if resultado['victoria']:
-                self._victoria()
-            else:
-                self._derrota()
+    def _instalar_juego(self, juego):
+        """Reemplaza el juego actual por uno ya generado en el hilo del motor"""
+        if self.juego is not None:
+            self.juego.desuscribir(self._recibir_evento)
+        self.juego = juego
+        self._crear_tablero()
+        self._actualizar_banderas(juego.obtener_banderas_restantes())
 
-    def _click_derecho(self, fila, col):
-        """Maneja click derecho - Marcar"""
-        if self.juego.marcar_celda(fila, col):
-            estado = self.juego.obtener_estado_celda(fila, col)
-            btn = self.botones[fila][col]
+    def _atender_evento(self, evento: Evento):
+        """Actualiza la interfaz según el evento emitido por el back-end"""
+        if isinstance(evento, CeldasReveladas):
+            # Se pintan por partes en _procesar_resultados, según el presupuesto del cuadro
+            self._celdas_pendientes.extend(evento.celdas)
 
-            if estado['marcada']:
-                btn.config(text='🚩', fg='red', font=('Arial', 10))
-            else:
-                btn.config(text='', fg='black')
+        elif isinstance(evento, BanderaCambiada):
+            self._dibujar_oculta(evento.fila, evento.col, evento.marcada)
+            self._actualizar_banderas(evento.banderas_restantes)
 
-            self._actualizar_banderas()
+        elif isinstance(evento, MovimientoDeshecho):
+            # Deshacer solo cambia la celda del movimiento
+            if not evento.revelada:
+                self._dibujar_oculta(evento.fila, evento.col, evento.marcada)
+            self._actualizar_banderas(evento.banderas_restantes)
 
+        elif isinstance(evento, JuegoGanado):
+            self._aviso_final = self._victoria
+
+        elif isinstance(evento, JuegoPerdido):
+            self._mostrar_minas(evento.minas)
+            self._aviso_final = self._derrota
+
+    def _click_izquierdo(self, fila, col):
+        """Maneja click izquierdo - Revelar"""
+        if self.ocupado:
+            return
+        # La interfaz se actualiza con los eventos del juego
+        juego = self.juego
+        self._en_segundo_plano(lambda: juego.revelar_celda(fila, col))
+
+    def _click_derecho(self, fila, col):
+        """Maneja click derecho - Marcar"""
+        if not self.ocupado:
+            juego = self.juego
+            self._en_segundo_plano(lambda: juego.marcar_celda(fila, col))
         return "break"
 
-    def _actualizar_celda(self, fila, col):
+    def _dibujar_oculta(self, fila, col, marcada):
+        """Dibuja una celda sin revelar, con o sin bandera"""
+        self.botones[fila][col].config(
+            text='🚩' if marcada else '',
+            fg='red' if marcada else 'black',
+            bg='#95a5a6',
+            relief=tk.RAISED,
+            state=tk.NORMAL,
+            font=('Arial', 10 if marcada else 12)
+        )
+
+    def _actualizar_celda(self, fila, col, minas_adyacentes, tiene_mina):
         """Actualiza una celda revelada"""
-        estado = self.juego.obtener_estado_celda(fila, col)
         btn = self.botones[fila][col]
+        btn.config(relief=tk.SUNKEN, bg='white', state=tk.DISABLED)
 
-        if estado['revelada']:
-            btn.config(relief=tk.SUNKEN, bg='white', state=tk.DISABLED)
-
-            if estado['tiene_mina']:
-                btn.config(text='💣', bg='#e74c3c', font=('Arial', 10))
-            elif estado['minas_adyacentes'] == 0:
-                btn.config(text='')
-            else:
-                num = estado['minas_adyacentes']
-                btn.config(text=str(num), fg=self.colores[num])
+        if tiene_mina:
+            btn.config(text='💣', bg='#e74c3c', font=('Arial', 10))
+        elif minas_adyacentes == 0:
+            btn.config(text='')
+        else:
+            btn.config(text=str(minas_adyacentes), fg=self.colores[minas_adyacentes])
 
-    def _actualizar_banderas(self):
+    def _actualizar_banderas(self, restantes):
         """Actualiza el contador de banderas"""
-        restantes = self.juego.obtener_banderas_restantes()
         self.label_banderas.config(text=f"🚩 {restantes}")
 
     def _deshacer(self):
         """Deshace el último movimiento"""
-        if self.juego.deshacer_movimiento():
-            # Refrescar tablero
-            for i in range(self.filas):
-                for j in range(self.columnas):
-                    estado = self.juego.obtener_estado_celda(i, j)
-                    btn = self.botones[i][j]
-
-                    if not estado['revelada']:
-                        btn.config(
-                            text='🚩' if estado['marcada'] else '',
-                            fg='red' if estado['marcada'] else 'black',
-                            bg='#95a5a6',
-                            relief=tk.RAISED,
-                            state=tk.NORMAL,
-                            font=('Arial', 10 if estado['marcada'] else 12)
-                        )
-                    else:
-                        self._actualizar_celda(i, j)
-
-            self._actualizar_banderas()
+        if self.ocupado:
+            return
+        self._en_segundo_plano(self.juego.deshacer_movimiento, self._deshacer_terminado)
+
+    def _deshacer_terminado(self, deshecho):
+        if deshecho:
+            return
+        if self.juego.juego_terminado:
+            messagebox.showinfo("Deshacer", "El juego terminó, inicia uno nuevo")
         else:
             messagebox.showinfo("Deshacer", "No hay movimientos para deshacer")
 
-    def _derrota(self):
-        """Muestra derrota"""
-        # Mostrar todas las minas
-        minas = self.juego.revelar_todo()
+    def _mostrar_aviso_final(self):
+        """Muestra el diálogo de victoria o derrota de la jugada que acaba de terminar"""
+        aviso = self._aviso_final
+        self._aviso_final = None
+        if aviso is not None:
+            aviso()
+
+    def _mostrar_minas(self, minas):
+        """Muestra todas las minas al perder"""
         for f, c in minas:
             btn = self.botones[f][c]
             btn.config(text='💣', bg='#e74c3c', relief=tk.SUNKEN, font=('Arial', 10))
 
+    def _derrota(self):
+        """Muestra derrota"""
         messagebox.showinfo("Perdiste", "💥 ¡Pailas! perdiste\n\n¡Inténtalo de nuevo!")
 
     def _victoria(self):
@@ -0,0 +1,561 @@
+"""
+Estructura de Datos - Entrega Final
+David López y Jhon Alexis
+Benchmarks del back-end
+
+Mide los caminos críticos de Buscaminas (construcción, reinicio, expansión,
+marcar/deshacer, contador de banderas y partidas completas) con semillas
+fijas. Reporta tiempo y memoria pico en JSON y compara contra una línea base.
+
+Uso:
+    python benchmarks/bench_buscaminas.py                        # nivel rápido
+    python benchmarks/bench_buscaminas.py --nivel completo -o salida.json
+    python benchmarks/bench_buscaminas.py --comparar benchmarks/linea_base.json
+    python benchmarks/bench_buscaminas.py --guardar-base benchmarks/linea_base.json
+    python benchmarks/bench_buscaminas.py --verificar           # modo bits == modo cola
+
+Un cambio que afecte un camino medido regenera la línea base en el mismo commit.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Optional, Tuple
+
+# Permitir importar el back-end desde la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Buscaminas import (  # noqa: E402
+    Buscaminas, LIMITE_CELDAS_CACHE, limpiar_cache_topologias, obtener_topologia
+)
+
+SEMILLA = 2024
+
+# Tamaños (filas, columnas) por nivel. Los tres primeros son los niveles
+# clásicos: principiante, intermedio y experto.
+NIVELES = {
+    'rapido': [(9, 9), (16, 16), (16, 30)],
+    'medio': [(9, 9), (16, 16), (16, 30), (100, 100)],
+    'completo': [(9, 9), (16, 16), (16, 30), (100, 100), (500, 500), (2000, 2000)],
+}
+
+# En tableros de más celdas que esto se hacen menos repeticiones y no hay
+# corrida de calentamiento: cada construcción de 2000x2000 toma segundos
+CELDAS_GRANDES = 250_000
+REPETICIONES_GRANDES = 3
+
+# Tablero más grande en el que se mide una partida click a click en modo bits
+CELDAS_PARTIDA_BITS = 10_000
+
+# Proporción de celdas con mina
+DENSIDADES = [0.10, 0.15, 0.20]
+
+# Tolerancia por defecto antes de considerar una regresión (25 %)
+TOLERANCIA = 0.25
+
+# Diferencias de tiempo menores a esto se consideran ruido (50 µs)
+MINIMO_ABSOLUTO_S = 50e-6
+
+# Cada repetición junta llamadas hasta durar al menos esto, para que los
+# casos de menos de un milisegundo no dependan del ruido de una sola llamada
+OBJETIVO_REPETICION_S = 0.010
+
+
+# PREPARACIÓN DE ESCENARIOS
+
+def _crear_juego(filas: int, columnas: int, densidad: float, semilla: int,
+                 modo_bits: bool = False) -> Buscaminas:
+    """Crea un juego reproducible con la densidad de minas indicada"""
+    random.seed(semilla)
+    num_minas = int(filas * columnas * densidad)
+    return Buscaminas(filas, columnas, num_minas, modo_bits=modo_bits)
+
+
+def _celdas_seguras(juego: Buscaminas) -> List[Tuple[int, int]]:
+    """Retorna las celdas sin mina en orden fila-columna"""
+    seguras = []
+    for i in range(juego.filas):
+        for j in range(juego.columnas):
+            if not juego.matriz[i][j].tiene_mina:
+                seguras.append((i, j))
+    return seguras
+
+
+def _primer_cero(juego: Buscaminas) -> Optional[Tuple[int, int]]:
+    """Retorna la primera celda sin minas adyacentes (inicio de una expansión)"""
+    for i in range(juego.filas):
+        for j in range(juego.columnas):
+            celda = juego.matriz[i][j]
+            if not celda.tiene_mina and celda.minas_adyacentes == 0:
+                return (i, j)
+    return None
+
+
+def _limpiar_estado(juego: Buscaminas):
+    """Oculta todas las celdas sin cambiar las minas, para repetir una medición"""
+    for i in range(juego.filas):
+        for j in range(juego.columnas):
+            celda = juego.matriz[i][j]
+            celda.revelada = False
+            celda.marcada = False
+    while not juego.historial.esta_vacia():
+        juego.historial.desapilar()
+    juego.celdas_reveladas = 0
+    juego.banderas_colocadas = 0
+    juego.juego_terminado = False
+    juego.victoria = False
+    if juego.bits is not None:
+        juego.bits.reveladas = 0
+        juego.bits.marcadas = 0
+
+
+# CASOS DE BENCHMARK
+# Cada caso recibe (filas, columnas, densidad, semilla) y retorna una tupla
+# (preparar, medir): preparar se ejecuta fuera del cronómetro y su resultado
+# se pasa a medir. Si el caso no aplica a ese tablero retorna None y no se
+# reporta.
+
+def caso_construccion(filas, columnas, densidad, semilla):
+    """Construcción en frío: incluye calcular la topología del tamaño"""
+    def preparar():
+        limpiar_cache_topologias()
+        random.seed(semilla)
+        return int(filas * columnas * densidad)
+
+    def medir(num_minas):
+        Buscaminas(filas, columnas, num_minas)
+
+    return preparar, medir
+
+
+def caso_construccion_cache(filas, columnas, densidad, semilla):
+    """Construcción con la topología ya en caché (otro juego del mismo tamaño)"""
+    # Los tableros más grandes que la caché nunca se guardan: no hay caso "con caché"
+    if filas * columnas > LIMITE_CELDAS_CACHE:
+        return None
+
+    def preparar():
+        obtener_topologia(filas, columnas)
+        random.seed(semilla)
+        return int(filas * columnas * densidad)
+
+    def medir(num_minas):
+        Buscaminas(filas, columnas, num_minas)
+
+    return preparar, medir
+
+
+def caso_reiniciar(filas, columnas, densidad, semilla):
+    juego = _crear_juego(filas, columnas, densidad, semilla)
+
+    def preparar():
+        random.seed(semilla + 1)
+        return juego
+
+    def medir(juego):
+        juego.reiniciar_juego()
+
+    return preparar, medir
+
+
+def caso_expansion_total(filas, columnas, densidad, semilla, modo_bits=False):
+    """Peor caso: tablero sin minas, un solo click revela todo el tablero"""
+    juego = _crear_juego(filas, columnas, 0.0, semilla, modo_bits)
+
+    def preparar():
+        _limpiar_estado(juego)
+        return juego
+
+    def medir(juego):
+        juego.revelar_celda(filas // 2, columnas // 2)
+
+    return preparar, medir
+
+
+def caso_expansion(filas, columnas, densidad, semilla):
+    """Expansión desde la primera celda vacía con la densidad indicada"""
+    juego = _crear_juego(filas, columnas, densidad, semilla)
+    inicio = _primer_cero(juego)
+    if inicio is None:
+        return None  # Sin celdas vacías no hay expansión que medir
+
+    def preparar():
+        _limpiar_estado(juego)
+        return juego
+
+    def medir(juego):
+        juego.revelar_celda(*inicio)
+
+    return preparar, medir
+
+
+def caso_marcar_deshacer(filas, columnas, densidad, semilla):
+    """Marca y desmarca celdas al azar y luego deshace todo el historial"""
+    juego = _crear_juego(filas, columnas, densidad, semilla)
+    rng = random.Random(semilla)
+    jugadas = [(rng.randrange(filas), rng.randrange(columnas)) for _ in range(1000)]
+
+    def preparar():
+        _limpiar_estado(juego)
+        return juego
+
+    def medir(juego):
+        for f, c in jugadas:
+            juego.marcar_celda(f, c)
+        while juego.deshacer_movimiento():
+            pass
+
+    return preparar, medir
+
+
+def caso_banderas_restantes(filas, columnas, densidad, semilla):
+    """Consulta el contador de banderas con la mitad de las minas marcadas"""
+    juego = _crear_juego(filas, columnas, densidad, semilla)
+    minas = juego.revelar_todo()
+    for f, c in minas[:len(minas) // 2]:
+        juego.marcar_celda(f, c)
+
+    def preparar():
+        return juego
+
+    def medir(juego):
+        for _ in range(100):
+            juego.obtener_banderas_restantes()
+
+    return preparar, medir
+
+
+def caso_partida(filas, columnas, densidad, semilla, modo_bits=False):
+    """Partida completa de un jugador perfecto: marca las minas y revela
+    todas las celdas seguras hasta ganar"""
+    juego = _crear_juego(filas, columnas, densidad, semilla, modo_bits)
+    minas = juego.revelar_todo()
+    seguras = _celdas_seguras(juego)
+
+    def preparar():
+        _limpiar_estado(juego)
+        return juego
+
+    def medir(juego):
+        for f, c in minas:
+            juego.marcar_celda(f, c)
+            juego.obtener_banderas_restantes()
+        for f, c in seguras:
+            if not juego.matriz[f][c].revelada:
+                juego.revelar_celda(f, c)
+        assert juego.victoria
+
+    return preparar, medir
+
+
+def caso_expansion_total_bits(filas, columnas, densidad, semilla):
+    return caso_expansion_total(filas, columnas, densidad, semilla, modo_bits=True)
+
+
+def caso_partida_bits(filas, columnas, densidad, semilla):
+    # En modo bits cada click opera sobre enteros del tamaño del tablero, así
+    # que una partida click a click es cuadrática: en tableros grandes no termina
+    if filas * columnas > CELDAS_PARTIDA_BITS:
+        return None
+    return caso_partida(filas, columnas, densidad, semilla, modo_bits=True)
+
+
+# Casos que dependen de la densidad y casos que no
+CASOS = {
+    'construccion': (caso_construccion, True),
+    'construccion_cache': (caso_construccion_cache, True),
+    'reiniciar_juego': (caso_reiniciar, True),
+    'revelar_celda_peor_caso': (caso_expansion_total, False),
+    'revelar_celda_peor_caso_bits': (caso_expansion_total_bits, False),
+    'revelar_celda_expansion': (caso_expansion, True),
+    'marcar_deshacer': (caso_marcar_deshacer, True),
+    'obtener_banderas_restantes': (caso_banderas_restantes, True),
+    'partida_completa': (caso_partida, True),
+    'partida_completa_bits': (caso_partida_bits, True),
+}
+
+
+# VERIFICACIÓN: el modo bits debe comportarse igual que el modo cola
+
+def _estado(juego: Buscaminas) -> tuple:
+    """Estado observable de un juego, para comparar dos modos"""
+    return (
+        juego.celdas_reveladas,
+        juego.juego_terminado,
+        juego.victoria,
+        juego.obtener_banderas_restantes(),
+        [celda.revelada for celda in juego.celdas],
+        [celda.marcada for celda in juego.celdas],
+    )
+
+
+def _resumen(resultado):
+    """Resultado de una jugada sin depender del orden de las celdas reveladas"""
+    if isinstance(resultado, dict):
+        return dict(resultado, celdas_reveladas=sorted(resultado['celdas_reveladas']))
+    return resultado
+
+
+def verificar_equivalencia(partidas: int = 400, semilla: int = SEMILLA) -> List[str]:
+    """
+    Juega partidas al azar (revelar, marcar, deshacer y revelar regiones de
+    ceros) en modo cola y en modo bits a la vez, y retorna las diferencias
+    """
+    diferencias = []
+    for partida in range(partidas):
+        rng = random.Random(semilla + partida)
+        filas, columnas = rng.randint(1, 20), rng.randint(1, 20)
+        num_minas = rng.randint(0, filas * columnas // 3)
+
+        random.seed(semilla + partida)
+        cola = Buscaminas(filas, columnas, num_minas)
+        random.seed(semilla + partida)
+        bits = Buscaminas(filas, columnas, num_minas, modo_bits=True)
+
+        for jugada in range(80):
+            opcion = rng.random()
+            fila, col = rng.randrange(filas), rng.randrange(columnas)
+            if opcion < 0.6:
+                # Casi siempre se evitan las minas para que la partida dure
+                if cola.matriz[fila][col].tiene_mina and rng.random() < 0.9:
+                    continue
+                nombre, args = 'revelar_celda', (fila, col)
+            elif opcion < 0.85:
+                nombre, args = 'marcar_celda', (fila, col)
+            elif opcion < 0.97:
+                nombre, args = 'deshacer_movimiento', ()
+            else:
+                nombre, args = 'revelar_regiones_cero', ()
+
+            resultado_cola = _resumen(getattr(cola, nombre)(*args))
+            resultado_bits = _resumen(getattr(bits, nombre)(*args))
+
+            # Los bits deben seguir a los nodos
+            reveladas = sum(1 << i for i, celda in enumerate(bits.celdas) if celda.revelada)
+            marcadas = sum(1 << i for i, celda in enumerate(bits.celdas) if celda.marcada)
+
+            if (resultado_cola != resultado_bits or _estado(cola) != _estado(bits)
+                    or bits.bits.reveladas != reveladas or bits.bits.marcadas != marcadas):
+                diferencias.append(
+                    f"partida {partida} ({filas}x{columnas}, {num_minas} minas), "
+                    f"jugada {jugada}: {nombre}{args}"
+                )
+                break
+    return diferencias
+
+
+# MEDICIÓN
+
+class _Referencia:
+    """Objeto pequeño para que la carga de referencia use atributos, como el juego"""
+
+    def __init__(self):
+        self.valor = 0
+
+
+def _carga_referencia() -> float:
+    """
+    Tiempo de una carga fija de Python puro (bucles, atributos, listas).
+    La velocidad de la máquina cambia con el tiempo, así que se mide junto a
+    cada repetición y el tiempo del caso se compara relativo a esta carga
+    """
+    objetos = [_Referencia() for _ in range(64)]
+    inicio = time.perf_counter()
+    for i in range(2000):
+        objeto = objetos[i & 63]
+        if objeto.valor >= 0:
+            objeto.valor += 1
+    return time.perf_counter() - inicio
+
+
+def _medir_caso(fabrica: Callable, filas: int, columnas: int, densidad: float,
+                semilla: int, repeticiones: int) -> Optional[dict]:
+    """Ejecuta un caso varias veces y retorna tiempos y memoria pico,
+    o None si el caso no aplica a este tablero"""
+    caso = fabrica(filas, columnas, densidad, semilla)
+    if caso is None:
+        return None
+    preparar, medir = caso
+
+    llamadas = 1
+    if filas * columnas > CELDAS_GRANDES:
+        repeticiones = min(repeticiones, REPETICIONES_GRANDES)
+    else:
+        # Corrida de calentamiento, fuera de la medición; también decide
+        # cuántas llamadas hacen falta para llegar a OBJETIVO_REPETICION_S
+        argumento = preparar()
+        inicio = time.perf_counter()
+        medir(argumento)
+        duracion = time.perf_counter() - inicio
+        llamadas = max(1, math.ceil(OBJETIVO_REPETICION_S / max(duracion, 1e-7)))
+
+    # Cada tiempo es el promedio por llamada de una repetición; preparar
+    # queda fuera del cronómetro. La carga de referencia se intercala con
+    # las llamadas para que ambas vean la misma velocidad de la máquina
+    tiempos = []
+    relativos = []
+    for _ in range(repeticiones):
+        total = 0.0
+        referencia = 0.0
+        for _ in range(llamadas):
+            argumento = preparar()
+            referencia += _carga_referencia()
+            inicio = time.perf_counter()
+            medir(argumento)
+            total += time.perf_counter() - inicio
+        tiempos.append(total / llamadas)
+        relativos.append(total / referencia)
+
+    # La memoria se mide en una corrida aparte: tracemalloc altera los tiempos
+    argumento = preparar()
+    tracemalloc.start()
+    medir(argumento)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'tiempo_s': statistics.median(tiempos),
+        'tiempo_min_s': min(tiempos),
+        'tiempo_relativo': statistics.median(relativos),
+        'memoria_pico_bytes': pico,
+        'repeticiones': repeticiones,
+        'llamadas_por_repeticion': llamadas,
+    }
+
+
+def ejecutar(nivel: str = 'rapido', repeticiones: int = 15, semilla: int = SEMILLA,
+             filtro: Optional[str] = None) -> dict:
+    """Ejecuta todos los casos del nivel y retorna el reporte completo"""
+    resultados = {}
+    no_aplica = []
+    for filas, columnas in NIVELES[nivel]:
+        for nombre, (fabrica, usa_densidad) in CASOS.items():
+            if filtro and filtro not in nombre:
+                continue
+            densidades = DENSIDADES if usa_densidad else [0.0]
+            for densidad in densidades:
+                clave = f"{nombre}/{filas}x{columnas}/d{densidad:.2f}"
+                print(f"  {clave} ...", end="", file=sys.stderr, flush=True)
+                resultado = _medir_caso(fabrica, filas, columnas, densidad,
+                                        semilla, repeticiones)
+                if resultado is None:
+                    print(" no aplica", file=sys.stderr)
+                    no_aplica.append(clave)
+                    continue
+                print(f" {resultado['tiempo_s'] * 1000:.3f} ms", file=sys.stderr)
+                resultados[clave] = resultado
+
+    return {
+        'meta': {
+            'nivel': nivel,
+            'filtro': filtro,
+            'semilla': semilla,
+            'repeticiones': repeticiones,
+            'python': platform.python_version(),
+            'implementacion': platform.python_implementation(),
+            'plataforma': platform.platform(),
+        },
+        'resultados': resultados,
+        'no_aplica': no_aplica,
+    }
+
+
+def comparar(actual: dict, base: dict, tolerancia: float = TOLERANCIA) -> List[str]:
+    """Compara dos reportes y retorna la lista de regresiones encontradas.
+    El tiempo se compara relativo a una carga de referencia medida al mismo
+    tiempo, que es la medida menos sensible al ruido de la máquina. Un caso de la línea base
+    que esta corrida debía medir y no midió también cuenta como regresión."""
+    regresiones = []
+
+    # Casos de la línea base que faltan: los que ahora "no aplican", y si la
+    # corrida cubre el mismo nivel completo, también los que ya no existen
+    meta = actual['meta']
+    mismo_alcance = meta.get('filtro') is None and meta['nivel'] == base['meta'].get('nivel')
+    no_aplica = set(actual.get('no_aplica', []))
+    for clave in sorted(base['resultados']):
+        if clave in actual['resultados']:
+            continue
+        if clave in no_aplica:
+            regresiones.append(f"{clave}: estaba en la línea base y ahora no aplica")
+        elif mismo_alcance:
+            regresiones.append(f"{clave}: estaba en la línea base y no se midió")
+    for clave, medido in actual['resultados'].items():
+        referencia = base['resultados'].get(clave)
+        if referencia is None:
+            continue
+
+        # El tiempo se juzga relativo a la carga de referencia; además la
+        # diferencia absoluta debe superar MINIMO_ABSOLUTO_S
+        diferencia_s = medido['tiempo_min_s'] - referencia['tiempo_min_s']
+        for metrica, significativa in (('tiempo_relativo', diferencia_s > MINIMO_ABSOLUTO_S),
+                                       ('memoria_pico_bytes', True)):
+            anterior = referencia[metrica]
+            nuevo = medido[metrica]
+            if significativa and anterior > 0 and nuevo > anterior * (1 + tolerancia):
+                regresiones.append(
+                    f"{clave} {metrica}: {anterior:.6g} -> {nuevo:.6g} "
+                    f"(+{(nuevo / anterior - 1) * 100:.1f} %)"
+                )
+    return regresiones
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Benchmarks de Buscaminas")
+    parser.add_argument('--nivel', choices=list(NIVELES), default='rapido')
+    parser.add_argument('--repeticiones', type=int, default=15)
+    parser.add_argument('--semilla', type=int, default=SEMILLA)
+    parser.add_argument('--filtro', help="Solo casos cuyo nombre contenga este texto")
+    parser.add_argument('-o', '--salida', help="Archivo JSON de salida (por defecto stdout)")
+    parser.add_argument('--comparar', metavar='BASE', help="Línea base JSON para comparar")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA)
+    parser.add_argument('--guardar-base', metavar='BASE', help="Guardar el reporte como línea base")
+    parser.add_argument('--verificar', metavar='PARTIDAS', type=int, nargs='?', const=400,
+                        help="Solo comparar el modo bits con el modo cola en partidas al azar")
+    args = parser.parse_args(argv)
+
+    if args.verificar is not None:
+        diferencias = verificar_equivalencia(args.verificar, args.semilla)
+        if diferencias:
+            print("Diferencias entre modo cola y modo bits:", file=sys.stderr)
+            for linea in diferencias:
+                print(f"  {linea}", file=sys.stderr)
+            return 1
+        print(f"Modo bits igual a modo cola en {args.verificar} partidas.", file=sys.stderr)
+        return 0
+
+    reporte = ejecutar(args.nivel, args.repeticiones, args.semilla, args.filtro)
+    texto = json.dumps(reporte, indent=2, sort_keys=True)
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            archivo.write(texto + "\n")
+    else:
+        print(texto)
+
+    if args.guardar_base:
+        with open(args.guardar_base, 'w', encoding='utf-8') as archivo:
+            archivo.write(texto + "\n")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        regresiones = comparar(reporte, base, args.tolerancia)
+        if regresiones:
+            print("\nRegresiones detectadas:", file=sys.stderr)
+            for linea in regresiones:
+                print(f"  {linea}", file=sys.stderr)
+            return 1
+        print("\nSin regresiones frente a la línea base.", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())